@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Detect which places changed between two per-year building permit files.
+Hashes each place's permit figures, keyed by (State Code, 6-Digit ID), and
+writes a compact changeset of added, removed and revised places with deltas.
+
+Usage:
+    python detect_changes.py 2024                        # 2023 -> 2024
+    python detect_changes.py 2024 --baseline old.csv     # revised 2024 file
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+PROCESSED_DIR = "historical_data/processed"
+CHANGES_DIR = f"{PROCESSED_DIR}/changes"
+
+KEY_COLUMNS = ['Code', 'ID']
+
+# Bldgs/Units/Value for each housing type, plus the imputed '.4'-'.7' repeats.
+# Layout columns (CBSA, CSA, footnote codes) shift between years and are
+# deliberately left out of the hash so they don't mark every place as revised.
+PERMIT_COLUMN_PATTERN = re.compile(r'^(Bldgs|Units|Value)(\.\d+)?$')
+
+# Same definition as add_total_units.py: 1-unit + 2-unit + 3-4 unit + 5+ unit
+UNIT_COLUMNS = ['Units', 'Units.1', 'Units.2', 'Units.3']
+
+
+def year_file(year):
+    """Path of the processed per-year file written by extract_historical.py."""
+    return f"{PROCESSED_DIR}/six_metros_{year}.csv"
+
+
+def load_year(file_path):
+    """Load a per-year file indexed by 'Code|ID', with Total_Units added."""
+    df = pd.read_csv(file_path, low_memory=False)
+
+    missing = [col for col in KEY_COLUMNS + ['Name'] if col not in df.columns]
+    if missing:
+        raise ValueError(f"{file_path} is missing required columns: {missing}")
+
+    # A single blank cell makes pandas parse the whole column as float, which
+    # would turn '11|1000' into '11.0|1000', so keys are rebuilt from integers
+    for col in KEY_COLUMNS:
+        raw = df[col]
+        numeric = pd.to_numeric(raw, errors='coerce')
+        blank = raw.isna() | raw.astype(str).str.strip().eq('')
+        malformed = (numeric.isna() & ~blank) | (numeric.notna() & (numeric % 1 != 0))
+        if malformed.any():
+            raise ValueError(
+                f"{file_path} has non-integer {col} values: {raw[malformed].tolist()[:5]}"
+            )
+        if blank.any():
+            print(f"  WARNING: {blank.sum()} rows in {file_path} have a blank {col}")
+        df[col] = numeric.astype('Int64')
+
+    df['key'] = df['Code'].map(key_part) + '|' + df['ID'].map(key_part)
+
+    duplicates = df.loc[df['key'].duplicated(), 'key'].tolist()
+    if duplicates:
+        raise ValueError(f"{file_path} has duplicate place keys: {duplicates[:5]}")
+
+    df['Name'] = df['Name'].astype(str).str.strip()
+    for col in permit_columns(df):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    df['Total_Units'] = df[[c for c in UNIT_COLUMNS if c in df.columns]].sum(axis=1, skipna=True)
+
+    return df.set_index('key')
+
+
+def key_part(value):
+    """Format one Code/ID value for the 'Code|ID' key ('' when missing)."""
+    return '' if pd.isna(value) else str(int(value))
+
+
+def permit_columns(df):
+    """Permit figure columns present in df, in file order."""
+    return [col for col in df.columns if PERMIT_COLUMN_PATTERN.match(col)]
+
+
+def row_hashes(df, columns):
+    """SHA-1 of each place's name and permit figures over a fixed column list."""
+    # Hash normalized values rather than str() of the cell, so 187 in an int64
+    # column and 187.0 in a float64 column (one blank cell) hash the same
+    canonical = df[columns].apply(lambda col: col.map(canonical_value))
+    canonical.insert(0, 'Name', df['Name'])
+    return canonical.apply(
+        lambda row: hashlib.sha1('\x1f'.join(map(str, row)).encode('utf-8')).hexdigest(),
+        axis=1,
+    )
+
+
+def to_number(value):
+    """Convert a pandas scalar to a JSON-friendly int/float (None for NaN)."""
+    if pd.isna(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def canonical_value(value):
+    """String form of a permit figure that doesn't depend on the column dtype."""
+    number = to_number(value)
+    return '' if number is None else str(number)
+
+
+def place_summary(row):
+    # Taken from the 'Code|ID' index key so the changeset matches it exactly
+    code, place_id = row.name.split('|')
+    return {
+        'code': code or None,
+        'id': place_id or None,
+        'name': row['Name'],
+        'total_units': to_number(row['Total_Units']),
+    }
+
+
+def compute_changeset(old_df, new_df):
+    """Compare two loaded year files and return the changeset as a dict."""
+    # Hash over the columns both files share so a layout change alone
+    # (e.g. an extra column in one year) doesn't revise every place.
+    columns = [col for col in permit_columns(old_df) if col in set(permit_columns(new_df))]
+
+    old_hashes = row_hashes(old_df, columns)
+    new_hashes = row_hashes(new_df, columns)
+
+    added_keys = new_df.index.difference(old_df.index)
+    removed_keys = old_df.index.difference(new_df.index)
+    common_keys = new_df.index.intersection(old_df.index)
+    revised_keys = common_keys[old_hashes[common_keys] != new_hashes[common_keys]]
+
+    revised = []
+    for key in revised_keys:
+        old_row = old_df.loc[key]
+        new_row = new_df.loc[key]
+
+        deltas = {}
+        for col in columns + ['Total_Units']:
+            old_value, new_value = old_row[col], new_row[col]
+            if pd.isna(old_value) and pd.isna(new_value):
+                continue
+            if old_value == new_value:
+                continue
+            delta = None
+            if not (pd.isna(old_value) or pd.isna(new_value)):
+                delta = to_number(new_value - old_value)
+            deltas[col] = {
+                'old': to_number(old_value),
+                'new': to_number(new_value),
+                'delta': delta,
+            }
+
+        entry = place_summary(new_row)
+        if old_row['Name'] != new_row['Name']:
+            entry['old_name'] = old_row['Name']
+        entry['old_hash'] = old_hashes[key]
+        entry['new_hash'] = new_hashes[key]
+        entry['deltas'] = deltas
+        revised.append(entry)
+
+    return {
+        'hashed_columns': ['Name'] + columns,
+        'summary': {
+            'old_places': len(old_df),
+            'new_places': len(new_df),
+            'added': len(added_keys),
+            'removed': len(removed_keys),
+            'revised': len(revised),
+            'unchanged': len(common_keys) - len(revised),
+        },
+        'added': [
+            dict(place_summary(new_df.loc[key]), hash=new_hashes[key])
+            for key in added_keys
+        ],
+        'removed': [
+            dict(place_summary(old_df.loc[key]), hash=old_hashes[key])
+            for key in removed_keys
+        ],
+        'revised': revised,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Emit a changeset of added, removed and revised places for a year file."
+    )
+    parser.add_argument('year', type=int, help="Year of the new file, e.g. 2024")
+    parser.add_argument('--new', help="New file (default: six_metros_{year}.csv)")
+    parser.add_argument('--baseline',
+                        help="File to compare against (default: previous year's file). "
+                             "Pass the old copy of the same year to diff a Census revision.")
+    parser.add_argument('--output', help=f"Changeset path (default: {CHANGES_DIR}/...)")
+    args = parser.parse_args()
+
+    new_file = args.new or year_file(args.year)
+    old_file = args.baseline or year_file(args.year - 1)
+
+    for file_path in (old_file, new_file):
+        if not Path(file_path).exists():
+            parser.error(f"file not found: {file_path} "
+                         "(use --baseline/--new to choose the files to compare)")
+
+    print("="*70)
+    print(f"Change Detection: {old_file} -> {new_file}")
+    print("="*70)
+
+    old_df = load_year(old_file)
+    new_df = load_year(new_file)
+    print(f"Loaded {len(old_df)} baseline places and {len(new_df)} new places")
+
+    changeset = compute_changeset(old_df, new_df)
+    changeset = {
+        'year': args.year,
+        'baseline_file': old_file,
+        'new_file': new_file,
+        **changeset,
+    }
+
+    if args.output:
+        output_file = args.output
+    elif args.baseline:
+        output_file = f"{CHANGES_DIR}/six_metros_{args.year}_revision.json"
+    else:
+        output_file = f"{CHANGES_DIR}/six_metros_{args.year - 1}_to_{args.year}.json"
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(changeset, f, indent=2)
+
+    summary = changeset['summary']
+    print(f"\nAdded:     {summary['added']:4d} places")
+    print(f"Removed:   {summary['removed']:4d} places")
+    print(f"Revised:   {summary['revised']:4d} places")
+    print(f"Unchanged: {summary['unchanged']:4d} places")
+    print(f"\n✅ Changeset saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Checks for detect_changes.py on small in-memory year files."""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detect_changes import compute_changeset, load_year
+
+HEADER = "Date,Code,ID,Name,Bldgs,Units,Value,Units.1,Units.2,Units.3,Value.7\n"
+
+
+def write_year(tmp_path, name, rows):
+    file_path = tmp_path / name
+    file_path.write_text(HEADER + "".join(row + "\n" for row in rows))
+    return str(file_path)
+
+
+def test_blank_cell_is_reported_as_revision(tmp_path):
+    old_file = write_year(tmp_path, "old.csv", [
+        "2024,11,1000,Washington,146,146,41892190,82,3,1506,5",
+        "2024,24,121000,Charles County,803,803,316041562,0,0,372,7",
+    ])
+    # Blank Value.7 cell makes the column float64; Washington's Units change
+    new_file = write_year(tmp_path, "new.csv", [
+        "2024,11,1000,Washington,146,156,41892190,82,3,1506,5",
+        "2024,24,121000,Charles County,803,803,316041562,0,0,372,",
+    ])
+
+    changeset = compute_changeset(load_year(old_file), load_year(new_file))
+
+    assert changeset['summary']['revised'] == 2
+    assert changeset['summary']['unchanged'] == 0
+    revised = {entry['id']: entry for entry in changeset['revised']}
+    assert revised['1000']['deltas']['Units']['delta'] == 10
+    assert list(revised['121000']['deltas']) == ['Value.7']
+
+
+def test_unchanged_values_hash_the_same_across_dtypes(tmp_path):
+    old_file = write_year(tmp_path, "old.csv", [
+        "2024,11,1000,Washington,146,146,41892190,82,3,1506,5",
+        "2024,24,121000,Charles County,803,803,316041562,0,0,372,",
+    ])
+    new_file = write_year(tmp_path, "new.csv", [
+        "2024,11,1000,Washington,146,146,41892190,82,3,1506,5",
+        "2024,24,121000,Charles County,803,803,316041562,0,0,372,",
+    ])
+    old_df = load_year(old_file)
+    new_df = load_year(new_file)
+    new_df['Units'] = new_df['Units'].astype(float)
+
+    changeset = compute_changeset(old_df, new_df)
+
+    assert changeset['summary']['revised'] == 0
+    assert changeset['summary']['unchanged'] == 2
+
+
+def test_float_key_columns_keep_integer_keys(tmp_path):
+    old_file = write_year(tmp_path, "old.csv", [
+        "2024,11,1000,Washington,146,146,41892190,82,3,1506,5",
+    ])
+    # A blank Code cell parses the Code column as float64
+    new_file = write_year(tmp_path, "new.csv", [
+        "2024,11,1000,Washington,146,146,41892190,82,3,1506,5",
+        "2024,,999999,Unknown,1,1,1,0,0,0,0",
+    ])
+
+    new_df = load_year(new_file)
+    assert '11|1000' in new_df.index
+    assert pd.isna(new_df.loc['|999999', 'Code'])
+
+    changeset = compute_changeset(load_year(old_file), new_df)
+    assert changeset['summary']['removed'] == 0
+    assert changeset['summary']['unchanged'] == 1
+    assert changeset['added'][0]['code'] is None
+    assert changeset['added'][0]['id'] == '999999'
+
+
+def test_malformed_key_column_is_rejected(tmp_path):
+    file_path = write_year(tmp_path, "bad.csv", [
+        "2024,11,1000,Washington,146,146,41892190,82,3,1506,5",
+        "2024,24,121000*,Charles County,803,803,316041562,0,0,372,7",
+    ])
+
+    with pytest.raises(ValueError, match="non-integer ID"):
+        load_year(file_path)